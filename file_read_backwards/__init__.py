@@ -1,7 +0,0 @@
-# -*- coding: utf-8 -*-
-
-from .file_read_backwards import FileReadBackwards  # noqa: F401
-
-__author__ = """Robin Robin"""
-__email__ = 'robinsquare42@gmail.com'
-__version__ = '3.0.0'
@@ -1,14 +1,42 @@
 #!/usr/bin/env python3
 
-import argparse, sys, threading, logging, re, requests
+import argparse, os, sys, signal, threading, queue, logging, requests
+import matcher
 from pathlib import Path
-from time import sleep
-from file_read_backwards import FileReadBackwards
 from hashlib import sha256
 from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+try:
+  from watchfiles import watch, Change
+except ImportError:
+  watch = None # fall back to polling
+
+INotify = None
+if sys.platform.startswith('linux'):
+  try:
+    from inotify_simple import INotify, flags
+  except ImportError:
+    pass # fall back to watchfiles or polling
 
 VERSION = '1.2.10'
+log = logging.getLogger('interview_notify')
 default_server = 'https://ntfy.sh/'
+ignored_files = frozenset(('.DS_Store', 'thumbs.db'))
+
+# trigger (from matcher.match_line) -> (log message, notify kwargs)
+alerts = {
+  'interview_me': ('YOUR INTERVIEW IS HAPPENING ❗', dict(title='Your interview is happening❗', tags='rotating_light', priority=5)),
+  'interview_any': ('interview detected ⚠️', dict(title='Interview detected', tags='warning')),
+  'mention': ('mention detected ⚠️', dict(title="You've been mentioned", tags='wave')),
+  'netsplit': ('netsplit detected ⚠️', dict(title="Netsplit detected – requeue within 10min!", tags='electric_plug', priority=5)),
+  'kick': ('kick detected ⚠️', dict(title="You've been kicked – rejoin & requeue ASAP!", tags='anger', priority=5)),
+}
+
+http = requests.Session() # reuse connections across notifications
+http.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=1))
+http_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notify') # one worker keeps alerts in order
 
 parser = argparse.ArgumentParser(prog='interview_notify.py',
   description='IRC Interview Notifier v{}\nhttps://github.com/ftc2/interview-notify'.format(VERSION),
@@ -27,106 +55,181 @@ parser.add_argument('--nick', required=True, help='your IRC nick')
 parser.add_argument('--check-bot-nicks', default=True, action=argparse.BooleanOptionalAction, help="attempt to parse bot's nick. disable if your log files are not like '<nick> message' – default: enabled")
 parser.add_argument('--bot-nicks', metavar='NICKS', default='Gatekeeper', help='comma-separated list of bot nicks to watch – default: Gatekeeper')
 parser.add_argument('--mode', choices=['red', 'ops'], default='red', help='interview mode (affects triggers) – default: red')
+parser.add_argument('--force-polling', action='store_true', help='poll for changes instead of using OS file events. enable if your logs are on a network mount (NFS/SMB) – default: disabled')
 parser.add_argument('-v', action='count', default=5, dest='verbose', help='verbose (invoke multiple times for more verbosity)')
 parser.add_argument('--version', action='version', version='{} v{}'.format(parser.prog, VERSION))
 
 def log_scan():
-  """Poll dir for most recently modified log file and spawn a parser thread for the log"""
-  logging.info('scanner: watching logs in "{}"'.format(args.path))
+  """Watch dir for most recently modified log file and hand it to the parser thread"""
+  log.info('scanner: watching logs in "%s"', args.path)
   curr = find_latest_log()
-  logging.debug('scanner: current log: "{}"'.format(curr.name))
-  parser, parser_stop = spawn_parser(curr)
-  parser.start()
-  while True:
-    sleep(0.5) # polling delay for checking for newer logfile
+  curr_id = file_id(curr)
+  log.debug('scanner: current log: "%s"', curr.name)
+  log_paths.put(curr)
+  for changes in dir_changes():
+    curr_path = os.path.abspath(curr)
+    if changes: # watchfiles reports paths relative to a relative --log-dir when polling
+      changes = {(change, os.path.abspath(path)) for change, path in changes}
+    if (changes and all(change == Change.modified and path == curr_path for change, path in changes)
+        and file_id(curr) == curr_id):
+      continue # only the current log was written to, no need to rescan
     latest = find_latest_log()
     if curr != latest:
-      curr = latest
-      logging.info('scanner: newer log found: "{}"'.format(curr.name))
-      parser_stop.set()
-      parser.join()
-      parser, parser_stop = spawn_parser(curr)
-      parser.start()
+      curr, curr_id = latest, file_id(latest)
+      log.info('scanner: newer log found: "%s"', curr.name)
+      log_paths.put(curr)
+    elif file_id(curr) != curr_id: # polling can't tell a quick rename/rm + recreate from a write
+      curr_id = file_id(curr)
+      log.info('scanner: log was recreated: "%s"', curr.name)
+      log_paths.put(curr)
+
+def file_id(path):
+  """Identify the file at path (survives renames, changes when it's recreated)"""
+  try:
+    st = os.stat(path)
+  except FileNotFoundError:
+    return None
+  return st.st_dev, st.st_ino
+
+def dir_changes():
+  """Yield changed paths whenever the log dir may have changed (OS file events via watchfiles, else polling)"""
+  if watch is None:
+    log.debug('scanner: watchfiles not installed, polling for changes')
+    while not stop.wait(0.5): # polling delay for checking for newer logfile
+      yield None # unknown, rescan
+  else:
+    yield from watch(args.path, stop_event=stop, step=50, recursive=False, force_polling=args.force_polling)
 
 def find_latest_log():
   """Find latest log file"""
-  files = [f for f in args.path.iterdir() if f.is_file() and f.name not in ['.DS_Store', 'thumbs.db']]
-  if len(files) == 0:
+  latest, latest_mtime = None, None
+  with os.scandir(args.path) as entries: # DirEntry caches stat() results
+    for f in entries:
+      if f.name in ignored_files:
+        continue
+      try:
+        if not f.is_file():
+          continue
+        mtime = f.stat().st_mtime
+      except FileNotFoundError: # deleted since scandir listed it (rotation, temp files)
+        continue
+      if latest is None or mtime > latest_mtime:
+        latest, latest_mtime = f.path, mtime
+  if latest is None:
     crit_quit('no log files found')
-  return max(files, key=lambda f: f.stat().st_mtime)
-
-def spawn_parser(log_path):
-  """Spawn new parser thread"""
-  logging.debug('spawning new parser')
-  parser_stop = threading.Event()
-  thread = threading.Thread(target=log_parse, args=(log_path, parser_stop))
-  return thread, parser_stop
-
-def log_parse(log_path, parser_stop):
-  """Parse log file and notify on triggers (parser thread)"""
-  logging.info('parser: using "{}"'.format(log_path.name))
+  return Path(latest)
+
+def log_parse():
+  """Parse newest log file from the scanner and notify on triggers (parser thread)"""
+  while True:
+    log_path = log_paths.get()
+    while not log_paths.empty(): # skip straight to the newest
+      log_path = log_paths.get_nowait()
+    if log_path is None or stop.is_set(): # shutting down
+      return
+    log.info('parser: using "%s"', log_path.name)
+    try:
+      parse(log_path)
+    except OSError as e: # e.g. rotated away (and compressed) before we got to it – wait for the next one
+      log.error('parser: can\'t read "%s": %s', log_path.name, e)
+
+def parse(log_path):
+  """Notify on triggers in a log file as it's written to"""
   for line in tail(log_path, parser_stop):
-    logging.debug(line)
-    if check_trigger(line, 'Currently interviewing: {}'.format(args.nick)):
-      logging.info('YOUR INTERVIEW IS HAPPENING ❗')
-      notify(line, title='Your interview is happening❗', tags='rotating_light', priority=5)
-    elif check_trigger(line, 'Currently interviewing:'):
-      logging.info('interview detected ⚠️')
-      notify(line, title='Interview detected', tags='warning')
-    elif check_trigger(line, '{}:'.format(args.nick), disregard_bot_nicks=True):
-      logging.info('mention detected ⚠️')
-      notify(line, title="You've been mentioned", tags='wave')
-    elif check_words(line, triggers=['quit', 'disconnect', 'part', 'left', 'leave']):
-      logging.info('netsplit detected ⚠️')
-      notify(line, title="Netsplit detected – requeue within 10min!", tags='electric_plug', priority=5)
-    elif check_words(line, triggers=['kick'], check_nick=True):
-      logging.info('kick detected ⚠️')
-      notify(line, title="You've been kicked – rejoin & requeue ASAP!", tags='anger', priority=5)
+    if log.isEnabledFor(logging.DEBUG): # skip the decode unless it'll be shown
+      log.debug('%s', line.decode('utf-8', 'replace'))
+    trigger = matcher.match_line(line)
+    if trigger:
+      message, notification = alerts[trigger]
+      log.info(message)
+      notify(line, **notification)
+
+class ParserStop:
+  """Tells tail() to stop once a newer log (or shutdown) is queued – quacks like an Event"""
+  def is_set(self):
+    return stop.is_set() or not log_paths.empty()
+  def wait(self, timeout):
+    stop.wait(timeout)
+    return self.is_set()
 
 def tail(path, parser_stop):
-  """Poll file and yield lines as they appear"""
-  with FileReadBackwards(path) as f:
-    last_line = f.readline()
+  """Watch file and yield lines (bytes) as they appear, until stopped or the file is rotated away"""
+  with open(path, 'rb') as f: # bytes: only matching lines ever get decoded
+    last_line = read_last_line(f)
     if last_line:
       yield last_line
-  with open(path) as f:
-    f.seek(0, 2) # os.SEEK_END
-    while not parser_stop.is_set():
-      line = f.readline()
-      if not line:
-        sleep(0.1) # polling delay for checking for new lines
-        continue
-      yield line
+    pos = f.tell()
+    for maybe_moved in file_changes(path, parser_stop):
+      pos = yield from read_new_lines(f, pos)
+      if maybe_moved and file_replaced(path, f):
+        log.debug('parser: "%s" was moved or deleted', path.name)
+        break # the scanner will hand over whatever replaces it
+    yield from read_new_lines(f, pos) # drain anything written before we were stopped
 
-def check_trigger(line, trigger, disregard_bot_nicks=False):
-  """Check for a trigger in a line"""
-  if disregard_bot_nicks or not args.check_bot_nicks:
-    return trigger in remove_html_tags(line)
+def read_new_lines(f, pos):
+  """Yield complete lines written to f after pos, return the new pos
+
+  Reads the new data in one pread() and splits it with find() (memchr), so there are no
+  per-line reads through the io buffer. (Not mmap: a truncate racing the read would SIGBUS.)
+  """
+  size = os.fstat(f.fileno()).st_size
+  if size < pos: # truncated: start over
+    pos = 0
+  if size == pos:
+    return pos
+  data = pread(f, size - pos, pos) # comes back short (not crashing) if truncated meanwhile
+  i = 0
+  while (nl := data.find(b'\n', i)) >= 0:
+    yield data[i:nl+1]
+    i = nl + 1
+  return pos + i # a partial last line is picked up once its newline arrives
+
+def pread(f, n, offset):
+  """Read n bytes of f at offset (os.pread is Unix only)"""
+  if hasattr(os, 'pread'):
+    return os.pread(f.fileno(), n, offset)
+  f.seek(offset)
+  return f.read(n)
+
+def file_replaced(path, f):
+  """Check if path no longer refers to the open file f"""
+  try:
+    return not os.path.samestat(os.stat(path), os.fstat(f.fileno()))
+  except FileNotFoundError:
+    return True
+
+def read_last_line(f, window=8192):
+  """Read the last line of a file, scanning back from the end (leaves f at EOF)"""
+  end = f.seek(0, 2) # os.SEEK_END
+  while True:
+    start = max(0, end - window)
+    f.seek(start)
+    lines = f.read(end - start).splitlines()
+    if len(lines) > 1 or start == 0: # last line is complete
+      f.seek(end)
+      return lines[-1] if lines else b''
+    window *= 2 # no newline before the last line yet, look further back
+
+def file_changes(path, parser_stop):
+  """Yield whenever a file may have grown (inotify, else watchfiles, else polling)
+
+  Yields True if the file may also have been moved or deleted (always, without inotify).
+  """
+  if INotify is not None and not args.force_polling:
+    moved = flags.MOVE_SELF | flags.DELETE_SELF | flags.ATTRIB # ATTRIB: link count changed on unlink
+    with INotify() as inotify:
+      inotify.add_watch(path, flags.MODIFY | moved)
+      yield False # catch up on anything written before the watch was added
+      while not parser_stop.is_set():
+        events = inotify.read(timeout=500) # timeout so parser_stop is still checked
+        if events:
+          yield any(event.mask & moved for event in events)
+  elif watch is not None:
+    for _ in watch(path, stop_event=parser_stop, step=50, force_polling=args.force_polling):
+      yield True # a quick rename + recreate can show up as just 'modified', so always check (one stat)
   else:
-    triggers = bot_nick_prefix(trigger)
-    return any(trigger in line for trigger in triggers)
-
-def check_words(line, triggers, check_nick=False):
-  """Check if a trigger & a bot nick & (optionally) user nick all appear in a string"""
-  for trigger in triggers:
-    for bot in args.bot_nicks.split(','):
-      if check_nick:
-        if args.nick in line and bot in line and trigger.lower() in line.lower():
-          return True
-      else:
-        if bot in line and trigger.lower() in line.lower():
-          return True
-  return False
-
-def remove_html_tags(text):
-  """Remove html tags from a string"""
-  clean = re.compile('<.*?>')
-  return re.sub(clean, '', text)
-
-def bot_nick_prefix(trigger):
-  """Prefix a trigger with bot nick(s) to reduce false positives"""
-  nicks = args.bot_nicks.split(',')
-  return ['{}> {}'.format(nick, trigger) for nick in nicks]
+    while not parser_stop.wait(0.1): # polling delay for checking for new lines
+      yield True
 
 def notify(data, topic=None, server=None, **kwargs):
   """Send notification via ntfy"""
@@ -135,9 +238,15 @@ def notify(data, topic=None, server=None, **kwargs):
   if server[-1] != '/': server += '/'
   target = urljoin(server, topic, allow_fragments=False)
   headers = {k.capitalize():str(v).encode('utf-8') for (k,v) in kwargs.items()}
-  requests.post(target,
-                data=data.encode(encoding='utf-8'),
-                headers=headers)
+  if isinstance(data, str): data = data.encode(encoding='utf-8') # log lines are already bytes
+  http_pool.submit(post, target, data, headers)
+
+def post(target, data, headers):
+  """POST to ntfy without blocking the caller (notify thread)"""
+  try:
+    http.post(target, data=data, headers=headers, timeout=5)
+  except requests.RequestException as e:
+    log.error('notify: POST to "%s" failed: %s', target, e)
 
 def anon_telemetry():
   """Send anonymous telemetry
@@ -154,16 +263,28 @@ def anon_telemetry():
           server=default_server,
           title='Anonymous Telemetry', topic='interview-notify-telemetry', tags='telephone_receiver')
 
+def shutdown(*_):
+  """Stop scanner & parser threads (also the SIGINT/SIGTERM handler)"""
+  stop.set()
+  log_paths.put(None) # wakes the parser and ends its tail()
+
 def crit_quit(msg):
-  logging.critical(msg)
+  log.critical(msg)
+  shutdown()
   sys.exit()
 
 # ----------
 
 args = parser.parse_args()
 
+stop = threading.Event()
+log_paths = queue.Queue() # scanner -> parser, None means shut down
+parser_stop = ParserStop()
+
 args.verbose = 70 - (10*args.verbose) if args.verbose > 0 else 0
 logging.basicConfig(level=args.verbose, format='%(asctime)s %(levelname)s: %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+if args.verbose > logging.DEBUG: # watchfiles logs every change at INFO
+  logging.getLogger('watchfiles').setLevel(max(args.verbose, logging.WARNING))
 
 if args.mode != 'red':
   crit_quit('"{}" mode not implemented'.format(args.mode))
@@ -173,7 +294,25 @@ if args.path.is_file():
 elif not args.path.is_dir():
   crit_quit('log path invalid')
 
-scanner = threading.Thread(target=log_scan)
+# log lines are matched as bytes, so triggers are encoded once here
+matcher.configure(args.nick.encode('utf-8'),
+                  tuple(bot.strip().encode('utf-8') for bot in args.bot_nicks.split(',')),
+                  args.check_bot_nicks)
+
+anon_telemetry() # non-blocking; also warms up a connection to the default server
+
+signal.signal(signal.SIGINT, shutdown)
+signal.signal(signal.SIGTERM, shutdown)
+
+parser_thread = threading.Thread(target=log_parse, daemon=True)
+parser_thread.start()
+scanner = threading.Thread(target=log_scan, daemon=True)
 scanner.start()
 
-anon_telemetry()
+while not stop.wait(1): # keep main thread alive (and responsive to signals) while the others work
+  if not (parser_thread.is_alive() and scanner.is_alive()):
+    log.critical('%s thread died', 'parser' if not parser_thread.is_alive() else 'scanner')
+    shutdown() # and join the other one below
+log.info('stopping')
+scanner.join()
+parser_thread.join()
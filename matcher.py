@@ -0,0 +1,70 @@
+"""Per-line trigger matching for interview_notify.py
+
+Fully type-annotated so it can optionally be compiled with mypyc (`mypyc matcher.py`).
+Python picks up the compiled module if it's there, otherwise it imports this file as-is.
+"""
+
+import re
+from typing import Final, Optional, Tuple
+
+html_tag_re: Final = re.compile(rb'<[^<>]*>') # [^<] keeps runs of unbalanced '<' linear
+netsplit_words: Final = (b'quit', b'disconnect', b'part', b'left', b'leave')
+kick_words: Final = (b'kick',)
+scan_limit: Final = 1024 # triggers are near the start of a line; IRC messages are <= 512 bytes (RFC 2812)
+
+# set by configure(); log lines are matched as bytes, so everything here is pre-encoded
+nick: bytes = b''
+bot_nicks: Tuple[bytes, ...] = ()
+check_bot_nicks: bool = True
+interview_me_triggers: Tuple[bytes, ...] = ()
+interview_any_triggers: Tuple[bytes, ...] = ()
+mention_trigger: bytes = b''
+
+def configure(your_nick: bytes, bots: Tuple[bytes, ...], check_bots: bool) -> None:
+  """Build the triggers to look for (run once at startup)"""
+  global nick, bot_nicks, check_bot_nicks, interview_me_triggers, interview_any_triggers, mention_trigger
+  nick = your_nick
+  bot_nicks = bots
+  check_bot_nicks = check_bots
+  interview_me_triggers = build_triggers(b'Currently interviewing: ' + nick)
+  interview_any_triggers = build_triggers(b'Currently interviewing:')
+  mention_trigger = nick + b':'
+
+def match_line(line: bytes) -> Optional[str]:
+  """Find which trigger a line fires (if any) in one pass, checking each substring at most once"""
+  line = line[:scan_limit] # bound the work on pathological (pasted/dumped) lines
+  has_bot = any(bot in line for bot in bot_nicks)
+  has_nick = nick in line
+  if check_bot_nicks and not (has_bot or has_nick):
+    return None # cheap exit for most lines
+  # strip html at most once per line, and only when something needs it (remove_html_tags skips lines without '<')
+  clean = remove_html_tags(line) if has_nick or not check_bot_nicks else line
+  if has_bot or not check_bot_nicks:
+    interview_line = line if check_bot_nicks else clean
+    if check_trigger(interview_line, interview_any_triggers): # interview_me triggers extend these
+      return 'interview_me' if check_trigger(interview_line, interview_me_triggers) else 'interview_any'
+  if has_nick and mention_trigger in clean:
+    return 'mention'
+  if has_bot:
+    lower = line.lower()
+    if any(word in lower for word in netsplit_words):
+      return 'netsplit'
+    if has_nick and any(word in lower for word in kick_words):
+      return 'kick'
+  return None
+
+def check_trigger(line: bytes, triggers: Tuple[bytes, ...]) -> bool:
+  """Check for any of a set of prebuilt triggers in a line"""
+  return any(trigger in line for trigger in triggers)
+
+def remove_html_tags(text: bytes) -> bytes:
+  """Remove html tags from a string"""
+  return text if b'<' not in text else html_tag_re.sub(b'', text)
+
+def build_triggers(trigger: bytes) -> Tuple[bytes, ...]:
+  """Build the strings to look for in a line for a trigger"""
+  return bot_nick_prefix(trigger) if check_bot_nicks else (trigger,)
+
+def bot_nick_prefix(trigger: bytes) -> Tuple[bytes, ...]:
+  """Prefix a trigger with bot nick(s) to reduce false positives"""
+  return tuple(b'%s> %s' % (bot, trigger) for bot in bot_nicks)